@@ -1,114 +1,95 @@
 # app.py
 import io
-import re
-import csv
+import os
+import pickle
+import time
 import zipfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-from typing import Iterable, Optional, Tuple, List, Dict, Set
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterable, List, Dict
 
 import streamlit as st
 
-# Optional: parempi TLD-parsinta (co.uk jne.)
+from filtering import (
+    DEFAULT_ALLOWED_RUN_PATTERNS,
+    PROGRESS_INTERVAL_S,
+    WordPrefixIndex,
+    all_modes_file,
+    all_modes_file_worker,
+    brandables_file,
+    brandables_file_worker,
+    filter_file,
+    filter_file_worker,
+    init_worker,
+    merge_file_results,
+    public_suffixes,
+    sort_brandables,
+)
+
+# Optional: sanalista triena (concat-haku yhdellä prefix-kävelyllä)
 try:
-    import tldextract
-    _TLDX = tldextract.TLDExtract(cache_dir=False)  # nopea, ei levycachea
+    import marisa_trie
 except Exception:
-    _TLDX = None
+    marisa_trie = None
 
 WORDLIST_FILE = "words_alpha.txt"
+ZIP_READ_WORKERS = 4
+# Download-tiedosto kirjoitetaan näin monen rivin paloina
+DOWNLOAD_CHUNK_LINES = 65536
+# Prosessipooli vasta tätä suuremmille syötteille: sarjassa ~2-5 MB/s, poolin käynnistys
+# (forkserver/spawn + sanalistan picklaus jokaiselle workerille) maksaa ~1-2 s
+PARALLEL_MIN_BYTES = 16 << 20
 
 # -------------------- WORDLIST --------------------
 @st.cache_resource
 def load_words(path: str) -> set[str]:
+    # Picklattu setti latautuu n. 2x nopeammin kuin tekstin parsinta (kylmäkäynnistys).
+    # Luodaan ensimmäisellä latauksella ja uusitaan, jos sanalista on uudempi.
+    cache_path = os.path.splitext(path)[0] + ".pkl"
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+    except Exception:
+        pass
+
     with open(path, "r", encoding="utf-8") as f:
-        return set(w.strip().lower() for w in f if len(w.strip()) > 2)
-
-# -------------------- DOMAIN PARSING --------------------
-def get_sld_and_tld(domain: str) -> Tuple[Optional[str], Optional[str]]:
-    d = domain.strip().lower().replace('"', "")
-    d = re.sub(r"^https?://", "", d)
-    if d.startswith("www."):
-        d = d[4:]
-
-    if _TLDX is not None:
-        ext = _TLDX(d)
-        if not ext.domain or not ext.suffix:
-            return None, None
-        sld = ext.domain
-        tld = ext.suffix
-    else:
-        parts = d.split(".")
-        if len(parts) < 2:
-            return None, None
-        tld = parts[-1]
-        sld = parts[-2]
-
-    # Puhdista sld kaikesta paitsi a-z ja -
-    sld_clean = re.sub(r"[^a-z\-]", "", sld)
-    if not sld_clean or not tld:
-        return None, None
-    return sld_clean, tld
-
-# -------------------- MATCH MODES --------------------
-def is_exact_word(sld: str, word_set: set[str]) -> bool:
-    """Täsmäosuma: vain yksi sana, ei väliviivaa eikä yhdistelmiä."""
-    if not sld or "-" in sld:
-        return False
-    return sld in word_set
-
-def is_valid_english_combo(sld: str, word_set: set[str]) -> bool:
-    """Laaja: yksi sana, väliviiva-yhdistelmä, tai kahden sanan concat."""
-    if not sld:
-        return False
-
-    # 1) Yksi sana
-    if sld in word_set:
-        return True
-
-    # 2) Väliviiva (word-word)
-    if "-" in sld:
-        parts = [p for p in sld.split("-") if p]
-        if len(parts) >= 2 and all(p in word_set for p in parts):
-            return True
-
-    # 3) Kahden sanan concat (wordword)
-    for i in range(3, len(sld) - 2):
-        if sld[:i] in word_set and sld[i:] in word_set:
-            return True
-
-    return False
-
-# -------------------- INPUT READING --------------------
-def iter_domains_from_text_bytes(data: bytes, suffix: str) -> Iterable[str]:
-    # Domain oletetaan ensimmäiseksi sarakkeeksi (CSV) tai rivin alkuun (TXT)
-    text = data.decode("utf-8", errors="ignore")
-
-    if suffix.lower() == ".csv":
-        reader = csv.reader(io.StringIO(text))
-        for row in reader:
-            if not row:
-                continue
-            yield row[0].strip()
-    else:
-        for line in text.splitlines():
-            raw = line.strip()
-            if not raw:
-                continue
-            yield raw.split(",")[0].strip()
+        words = set(w.strip().lower() for w in f if len(w.strip()) > 2)
+
+    try:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(words, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)  # atominen: rinnakkainen lataaja ei näe puolikasta tiedostoa
+    except OSError:
+        pass  # esim. vain luku -hakemisto: toimitaan ilman välimuistia
+    return words
+
+@st.cache_resource
+def load_word_trie(path: str):
+    """Sanalista prefix-hakuun: marisa-trie, tai WordPrefixIndex jos marisa_trie puuttuu."""
+    if marisa_trie is None:
+        return WordPrefixIndex(load_words(path))
+    return marisa_trie.Trie(load_words(path))
 
 @dataclass
 class FileItem:
     name: str
     suffix: str
-    data: bytes
+    data: memoryview  # upload-puskuri tai purettu zip-jäsen, ei ylimääräistä kopiota
 
 def collect_inputs(uploaded_files) -> List[FileItem]:
     items: List[FileItem] = []
 
     # Jos yksi zip on annettu, puretaan siitä
     if len(uploaded_files) == 1 and uploaded_files[0].name.lower().endswith(".zip"):
-        zdata = uploaded_files[0].getvalue()
-        with zipfile.ZipFile(io.BytesIO(zdata), "r") as zf:
+        # UploadedFile on itse seekattava tiedosto-olio -> ei getvalue()-kopiota
+        with zipfile.ZipFile(uploaded_files[0], "r") as zf:
+            members = []
             for info in zf.infolist():
                 if info.is_dir():
                     continue
@@ -117,70 +98,162 @@ def collect_inputs(uploaded_files) -> List[FileItem]:
                     continue
                 lower = name.lower()
                 if lower.endswith(".csv") or lower.endswith(".txt"):
-                    items.append(
-                        FileItem(
-                            name=name,
-                            suffix="." + lower.split(".")[-1],
-                            data=zf.read(info),
-                        )
-                    )
+                    members.append((name, "." + lower.split(".")[-1], info))
+
+            # zlib vapauttaa GIL:n purun ajaksi -> jäsenet puretaan rinnakkain säikeissä
+            with ThreadPoolExecutor(max_workers=ZIP_READ_WORKERS) as pool:
+                datas = pool.map(zf.read, [info for _, _, info in members])
+                for (name, suffix, _), data in zip(members, datas):
+                    items.append(FileItem(name=name, suffix=suffix, data=memoryview(data)))
     else:
         for uf in uploaded_files:
             lower = uf.name.lower()
             if lower.endswith(".csv") or lower.endswith(".txt"):
                 suffix = "." + lower.split(".")[-1]
-                items.append(FileItem(name=uf.name, suffix=suffix, data=uf.getvalue()))
+                items.append(FileItem(name=uf.name, suffix=suffix, data=uf.getbuffer()))
 
     # Aakkosjärjestys (päivämääränimillä tämä == kronologinen)
     items.sort(key=lambda x: x.name)
     return items
 
-# -------------------- STANDARD FILTER (EXACT/BROAD) --------------------
-def run_filter(files: List[FileItem], words: set[str], mode: str):
+# -------------------- PARALLEL RUN --------------------
+def _process_pool_context():
     """
-    mode:
-      - "exact": vain täsmäsanat
-      - "broad": sana / sana-sana / sanasana
+    forkserver-konteksti, tai spawn jos forkserver puuttuu (Windows, macOS-oletus).
+    Ei forkia: Streamlit-palvelin on monisäikeinen, ja säikeellisen prosessin fork voi jumittua.
+    Worker-funktiot ovat filtering-moduulissa, koska Streamlitin __main__ vaihtuu joka ajolla.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        # Palvelinprosessi importtaa nämä kerran -> workerit forkataan valmiiksi ladatusta
+        ctx.set_forkserver_preload(["streamlit", "filtering"])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+def _available_cpus() -> int:
+    # os.cpu_count() ei huomioi affiniteettia (taskset, kontin cpuset) -> liikaa workereita
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def _run_files_in_pool(files: List[FileItem], run_worker: Callable, args: tuple, words: set[str], word_trie, workers: int, results: list, progress) -> None:
+    """Täyttää results-listan workereissa; valmiit tulokset jäävät talteen, vaikka pooli kaatuisi."""
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_process_pool_context(),
+        initializer=init_worker,
+        initargs=(words, word_trie, public_suffixes()),
+    ) as pool:
+        # memoryview ei picklaudu -> tiedosto lähetetään bytes-kopiona. Jonossa korkeintaan
+        # yksi tiedosto per worker, ettei kaikista tiedostoista ole kopiota yhtä aikaa.
+        pending: Dict = {}
+        todo = iter(range(len(files)))
+
+        def submit_next() -> None:
+            for i in islice(todo, 1):
+                fi = files[i]
+                pending[pool.submit(run_worker, bytes(fi.data), fi.suffix, *args)] = i
+
+        for _ in range(workers):
+            submit_next()
+        done = 0
+        next_tick = 0.0
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                results[pending.pop(fut)] = fut.result()
+                done += 1
+                submit_next()
+            now = time.monotonic()
+            if now >= next_tick:
+                progress.progress(done / len(files))
+                next_tick = now + PROGRESS_INTERVAL_S
+
+def _run_files(files: List[FileItem], run_local: Callable, run_worker: Callable, args: tuple, words: set[str], word_trie=None) -> list:
+    """
+    Ajaa per-tiedosto-seulonnan ja palauttaa tulokset files-järjestyksessä.
+      - useampi tiedosto + useampi ydin + yhteensä vähintään PARALLEL_MIN_BYTES:
+        ProcessPoolExecutor (CPU-työ ohi GIL:n), run_worker(data, suffix, *args) on
+        filtering-moduulin funktio ja lukee sanalistan init_workerin asettamasta globaalista
+      - muuten (tai poolin kaaduttua loput tiedostot) tässä prosessissa:
+        run_local(data, suffix, *args, on_progress=...), on_progress saa luetut tavut
+    Tuloksen viimeinen alkio = käsitellyt rivit.
     """
-    results_com: List[str] = []
-    results_others: List[str] = []
-    seen: set[str] = set()
-
-    total_lines_est = max(1, sum(max(1, f.data.count(b"\n")) for f in files))
-    processed = 0
-
     progress = st.progress(0)
     status = st.empty()
-
-    for fi in files:
-        status.write(f"Käsitellään: **{fi.name}**")
-        for raw in iter_domains_from_text_bytes(fi.data, fi.suffix):
-            processed += 1
-            if processed % 5000 == 0:
-                progress.progress(min(1.0, processed / total_lines_est))
-
-            sld, tld = get_sld_and_tld(raw)
-            if not sld or not tld:
-                continue
-
-            full = f"{sld}.{tld}"
-            if full in seen:
-                continue
-
-            ok = is_exact_word(sld, words) if mode == "exact" else is_valid_english_combo(sld, words)
-            if not ok:
-                continue
-
-            seen.add(full)
-            if tld == "com":
-                results_com.append(full)
-            else:
-                results_others.append(full)
+    results: list = [None] * len(files)
+
+    total_bytes = sum(len(f.data) for f in files) or 1
+    workers = min(len(files), _available_cpus())
+
+    if workers > 1 and total_bytes >= PARALLEL_MIN_BYTES:
+        status.write(f"Käsitellään {len(files)} tiedostoa rinnakkain ({workers} prosessia)")
+        try:
+            _run_files_in_pool(files, run_worker, args, words, word_trie, workers, results, progress)
+        except BrokenProcessPool:
+            # Worker kuoli (esim. muisti loppui) -> puuttuvat tiedostot sarjassa
+            status.write("Rinnakkaisajo keskeytyi, jatketaan yhdessä prosessissa")
+
+    done_bytes = sum(len(fi.data) for fi, r in zip(files, results) if r is not None)
+    next_tick = 0.0
+    for i, fi in enumerate(files):
+        if results[i] is not None:
+            continue
+        # Monta pientä tiedostoa (esim. päiväkohtaiset zipissä) -> ei viestiä jokaisesta
+        now = time.monotonic()
+        if now >= next_tick:
+            status.write(f"Käsitellään: **{fi.name}**")
+            progress.progress(min(1.0, done_bytes / total_bytes))
+            next_tick = now + PROGRESS_INTERVAL_S
+
+        def on_progress(n: int, base: int = done_bytes) -> None:
+            progress.progress(min(1.0, (base + n) / total_bytes))
+
+        results[i] = run_local(fi.data, fi.suffix, *args, on_progress=on_progress)
+        done_bytes += len(fi.data)
 
     progress.progress(1.0)
     status.write("Valmis.")
+    return results
+
+# -------------------- STANDARD FILTER (EXACT/BROAD) --------------------
+def run_filter(files: List[FileItem], words: set[str], mode: str, word_trie=None):
+    """
+    mode:
+      - "exact": vain täsmäsanat
+      - "broad": sana / sana-sana / sanasana
+    """
+    parts = _run_files(
+        files,
+        partial(filter_file, words=words, word_trie=word_trie),
+        filter_file_worker,
+        (mode,),
+        words,
+        word_trie,
+    )
+    results_com, results_others = merge_file_results([p[:2] for p in parts])
+    processed = sum(p[-1] for p in parts)
     return results_com, results_others, processed, len(files)
 
+def lines_to_download(lines: Iterable[str]) -> io.BytesIO:
+    """
+    Rivit ladattavaksi tiedostoksi (rivinvaihdolla erotettuna). Kirjoitetaan BytesIO:hon paloina,
+    jolloin koko tekstiä ei ole muistissa kahdesti (str + bytes); download_button lukee
+    BytesIO:n getvalue():lla, joka jakaa puskurin ilman kopiota.
+    """
+    buf = io.BytesIO()
+    it = iter(lines)
+    sep = b""
+    while True:
+        chunk = list(islice(it, DOWNLOAD_CHUNK_LINES))
+        if not chunk:
+            break
+        buf.write(sep)
+        buf.write("\n".join(chunk).encode("utf-8"))
+        sep = b"\n"
+    buf.seek(0)
+    return buf
+
 def render_results(results_com: List[str], results_others: List[str], processed_lines: int, processed_files: int, label: str):
     st.subheader(f"Tulokset ({label})")
     st.write(f"Käsitelty tiedostoja: **{processed_files}**")
@@ -188,8 +261,8 @@ def render_results(results_com: List[str], results_others: List[str], processed_
     st.write(f"Löydetyt .com: **{len(results_com)}**")
     st.write(f"Löydetyt muut: **{len(results_others)}**")
 
-    com_text = "\n".join(results_com).encode("utf-8")
-    others_text = "\n".join(results_others).encode("utf-8")
+    com_text = lines_to_download(results_com)
+    others_text = lines_to_download(results_others)
 
     st.download_button(
         f"Lataa results_com_{label}.txt",
@@ -211,199 +284,37 @@ def render_results(results_com: List[str], results_others: List[str], processed_
         st.code("\n".join(results_others[:200]))
 
 # -------------------- BRANDABLES --------------------
-VOWELS = set("aeiouy")
-
-# Täysi C/V-kuvio (ei tiivistetty): reseptit 4–8 kirjaimeen
-# Esim. nanovian (8): n a n o v i a n -> C V C V C V V C = CVCVCVVC
-DEFAULT_ALLOWED_RUN_PATTERNS = [
-    # 4
-    "CVCV", "CVVC", "VCCV", "VCVC",
-
-    # 5
-    "CVCVC", "CVCCV", "CVCVV", "VCVCV", "VCCVC",
-
-    # 6
-    "CVCVCV", "CVCVVC", "CVCCVC", "CVCCVV", "VCVCVC", "VCCVCV",
-
-    # 7
-    "CVCVCVC", "CVCVVCV", "CVCVCVV", "CVCCVCV", "CVCCVVC", "VCCVCVC",
-
-    # 8 (sis. nanovian = CVCVCVVC)
-    "CVCVCVCV", "CVCVCVVC", "CVCVVCVC", "CVCCVCVC", "CVCCVVCV", "VCCVCVCV",
-]
-
-# Tiukennukset: harvinaiset kirjaimet ja huonot bigramit
-RARE_LETTERS = set("qxzj")
-DISALLOW_START = set("qx")
-DISALLOW_END = set("qx")
-BAD_BIGRAMS = {
-    "qx", "xq", "qj", "jq", "qz", "zq",
-    "wx", "xw", "vj", "jv", "zx", "xz",
-    "qh", "qk", "qc", "qg", "qt", "qd", "qb",
-}
-
-def cv_full_pattern(s: str) -> str:
-    """Täysi C/V-kuvio (ei tiivistystä). Esim. 'boon' -> CVVC."""
-    return "".join("V" if ch in VOWELS else "C" for ch in s)
-
-def has_repeated_chunk(s: str, chunk_min: int = 2, repeats: int = 3) -> bool:
-    """Etsii toistuvia paloja (kakaka/akakaka)."""
-    for n in range(chunk_min, min(4, len(s) // repeats) + 1):
-        if re.search(rf"(.{{{n}}})\1{{{repeats-1},}}", s):
-            return True
-    return False
-
-def brandability_score(s: str, settings: Dict) -> Tuple[int, str]:
-    """
-    Palauttaa (score, run_pattern). Score korkeampi = parempi.
-    run_pattern on TÄYSI C/V-kuvio.
-    """
-    s = s.lower()
-
-    if not s.isalpha():
-        return -999, ""
-    if len(s) < settings["min_len"] or len(s) > settings["max_len"]:
-        return -999, ""
-
-    # Ei väliviivoja brandables-tilassa
-    if "-" in s:
-        return -999, ""
-
-    # Jos halutaan nimenomaan ei-sanakirjaisia, hylätään oikeat sanat
-    if settings["reject_dictionary_words"] and s in settings["words"]:
-        return -999, ""
-
-    # ---- STRICT: hylkää q/x/z/j ja rumat bigramit ----
-    rare_count = sum(1 for ch in s if ch in RARE_LETTERS)
-    if rare_count > settings["max_rare_letters"]:
-        return -999, ""
-
-    if settings["strict_brandables"]:
-        if s[0] in DISALLOW_START or s[-1] in DISALLOW_END:
-            return -999, ""
-        if any((s[i:i+2] in BAD_BIGRAMS) for i in range(len(s) - 1)):
-            return -999, ""
-
-    # Kova hylkäys: 3 samaa peräkkäin
-    if re.search(r"(.)\1\1", s):
-        return -999, ""
-
-    # Kova hylkäys: tavutoisto
-    if settings["reject_repeats"] and has_repeated_chunk(s, chunk_min=2, repeats=3):
-        return -999, ""
-
-    # Liian pieni diversiteetti (esim. {a,k})
-    if len(set(s)) < settings["min_unique_chars"]:
-        return -999, ""
-
-    run_pat = cv_full_pattern(s)
-
-    # Runko-rajoitin (täysi kuvio)
-    allowed: Set[str] = settings["allowed_run_patterns"]
-    if allowed and run_pat not in allowed:
-        return -50, run_pat
-
-    score = 0
-
-    # Pituusbonus
-    if 5 <= len(s) <= 9:
-        score += 12
-    elif 4 <= len(s) <= 11:
-        score += 6
-    else:
-        score -= 8
-
-    # Pehmeä penalti harvinaisille kirjaimille (vaikka sallittaisiin)
-    score -= 10 * rare_count
-
-    # Vokaalisuhde
-    vcount = sum(1 for c in s if c in VOWELS)
-    v_ratio = vcount / len(s)
-    if settings["vowel_min"] <= v_ratio <= settings["vowel_max"]:
-        score += 25
-    elif (settings["vowel_min"] - 0.08) <= v_ratio <= (settings["vowel_max"] + 0.08):
-        score += 10
-    else:
-        score -= 18
-
-    # Konsonanttijonot
-    max_run = settings["max_consonant_run"]
-    if re.search(rf"[^{''.join(VOWELS)}]{{{max_run+1},}}", s):
-        score -= 30
-    elif re.search(rf"[^{''.join(VOWELS)}]{{{max_run},}}", s):
-        score -= 12
-
-    # Monotoninen CV-vuorottelu pitkästi (kakakaka)
-    full_pat = run_pat  # täysi kuvio
-    if re.search(r"(CV){4,}", full_pat) or re.search(r"(VC){4,}", full_pat):
-        score -= 18
-
-    # Bonus resepteille 4–8 (sis. nanovian = CVCVCVVC)
-    if run_pat in {
-        # 4
-        "CVCV", "CVVC", "VCCV", "VCVC",
-        # 5
-        "CVCVC", "CVCCV", "CVCVV", "VCVCV", "VCCVC",
-        # 6
-        "CVCVCV", "CVCVVC", "CVCCVC", "CVCCVV", "VCVCVC", "VCCVCV",
-        # 7
-        "CVCVCVC", "CVCVVCV", "CVCVCVV", "CVCCVCV", "CVCCVVC", "VCCVCVC",
-        # 8
-        "CVCVCVCV", "CVCVCVVC", "CVCVVCVC", "CVCCVCVC", "CVCCVVCV", "VCCVCVCV",
-    }:
-        score += 6
-
-    return score, run_pat
-
 def run_brandables(files: List[FileItem], words: set[str], settings: Dict):
-    # talletetaan words settingsiin (jotta voidaan reject_dictionary_words)
-    settings = dict(settings)
-    settings["words"] = words
-
-    results_com = []     # list of (domain, score, run_pat)
-    results_others = []  # list of (domain, score, run_pat)
-    seen: set[str] = set()
-
-    total_lines_est = max(1, sum(max(1, f.data.count(b"\n")) for f in files))
-    processed = 0
-
-    progress = st.progress(0)
-    status = st.empty()
-
-    for fi in files:
-        status.write(f"Käsitellään: **{fi.name}**")
-        for raw in iter_domains_from_text_bytes(fi.data, fi.suffix):
-            processed += 1
-            if processed % 5000 == 0:
-                progress.progress(min(1.0, processed / total_lines_est))
-
-            sld, tld = get_sld_and_tld(raw)
-            if not sld or not tld:
-                continue
-
-            full = f"{sld}.{tld}"
-            if full in seen:
-                continue
-
-            score, run_pat = brandability_score(sld, settings)
-            if score < settings["score_threshold"]:
-                continue
-
-            seen.add(full)
-            item = (full, score, run_pat)
-            if tld == "com":
-                results_com.append(item)
-            else:
-                results_others.append(item)
-
-    # Paras ensin
-    results_com.sort(key=lambda x: x[1], reverse=True)
-    results_others.sort(key=lambda x: x[1], reverse=True)
-
-    progress.progress(1.0)
-    status.write("Valmis.")
+    parts = _run_files(
+        files,
+        partial(brandables_file, words=words),
+        brandables_file_worker,
+        (settings,),
+        words,
+    )
+    results_com, results_others = merge_file_results([p[:2] for p in parts], key=lambda x: x[0])
+    sort_brandables(results_com, results_others)
+    processed = sum(p[-1] for p in parts)
     return results_com, results_others, processed, len(files)
 
+# -------------------- ALL MODES (ONE PASS) --------------------
+def run_all(files: List[FileItem], words: set[str], settings: Dict, word_trie=None):
+    """Kaikki kolme tilaa yhdellä ajolla. Palauttaa (exact, broad, brandables, rivit, tiedostot); kukin = (com, others)."""
+    parts = _run_files(
+        files,
+        partial(all_modes_file, words=words, word_trie=word_trie),
+        all_modes_file_worker,
+        (settings,),
+        words,
+        word_trie,
+    )
+    exact = merge_file_results([p[0:2] for p in parts])
+    broad = merge_file_results([p[2:4] for p in parts])
+    brand = merge_file_results([p[4:6] for p in parts], key=lambda x: x[0])
+    sort_brandables(*brand)
+    processed = sum(p[-1] for p in parts)
+    return exact, broad, brand, processed, len(files)
+
 def render_brandables(res_com, res_oth, processed_lines: int, processed_files: int, include_score: bool):
     st.subheader("Tulokset (brandables)")
     st.write(f"Käsitelty tiedostoja: **{processed_files}**")
@@ -414,8 +325,8 @@ def render_brandables(res_com, res_oth, processed_lines: int, processed_files: i
     def to_text(rows):
         if include_score:
             # domain<TAB>score<TAB>run_pattern
-            return "\n".join([f"{d}\t{sc}\t{pat}" for (d, sc, pat) in rows]).encode("utf-8")
-        return "\n".join([d for (d, _, _) in rows]).encode("utf-8")
+            return lines_to_download(f"{d}\t{sc}\t{pat}" for (d, sc, pat) in rows)
+        return lines_to_download(d for (d, _, _) in rows)
 
     st.download_button(
         "Lataa results_com_brandables.txt",
@@ -448,6 +359,8 @@ def main():
         st.error(f"Puuttuu {WORDLIST_FILE} samasta kansiosta kuin app.py")
         st.stop()
 
+    word_trie = load_word_trie(WORDLIST_FILE)
+
     st.write(f"Sanalista ladattu: **{len(words)}** sanaa")
 
     uploaded = st.file_uploader(
@@ -515,10 +428,11 @@ def main():
         "max_rare_letters": max_rare_letters,
     }
 
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     run_exact = col1.button("Aja TÄSMÄ", type="primary")
     run_broad = col2.button("Aja LAAJA")
     run_brand = col3.button("Aja BRANDABLES")
+    run_every = col4.button("Aja kaikki")
 
     if run_exact:
         with st.spinner("Seulotaan (täsmä)..."):
@@ -527,7 +441,7 @@ def main():
 
     if run_broad:
         with st.spinner("Seulotaan (laaja)..."):
-            results_com, results_others, processed_lines, processed_files = run_filter(files, words, mode="broad")
+            results_com, results_others, processed_lines, processed_files = run_filter(files, words, mode="broad", word_trie=word_trie)
         render_results(results_com, results_others, processed_lines, processed_files, label="broad")
 
     if run_brand:
@@ -535,5 +449,13 @@ def main():
             res_com, res_oth, processed_lines, processed_files = run_brandables(files, words, brand_settings)
         render_brandables(res_com, res_oth, processed_lines, processed_files, include_score=include_score)
 
+    if run_every:
+        # Yksi lukukierros kaikille kolmelle tilalle
+        with st.spinner("Seulotaan (kaikki)..."):
+            exact, broad, brand, processed_lines, processed_files = run_all(files, words, brand_settings, word_trie=word_trie)
+        render_results(*exact, processed_lines, processed_files, label="exact")
+        render_results(*broad, processed_lines, processed_files, label="broad")
+        render_brandables(*brand, processed_lines, processed_files, include_score=include_score)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,586 @@
+# filtering.py
+"""
+Domain-listojen parsinta ja seulonta (ei Streamlitiä).
+
+Streamlit ajaa app.py:n joka kierroksella uutena __main__-moduulina, joten
+prosessipoolin workerit eivät löydä sieltä funktioita. Tämä moduuli importataan
+kerran per prosessi: workerit (forkserver/spawn) picklaavat funktiot nimellä
+filtering.<nimi>.
+"""
+import io
+import re
+import csv
+import time
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import BinaryIO, Callable, Iterable, Optional, Tuple, List, Dict, Set
+
+# Optional: parempi TLD-parsinta (co.uk jne.)
+try:
+    import tldextract
+    _TLDX = tldextract.TLDExtract(cache_dir=False)  # nopea, ei levycachea
+except Exception:
+    _TLDX = None
+
+# Raw-rivien dedupe-setin yläraja per tiedosto (muistiraja; yli menevät parsitaan normaalisti)
+RAW_SEEN_MAX = 2_000_000
+# Streamlit-progress/status päivitetään korkeintaan näin usein (jokainen kutsu = websocket-viesti)
+PROGRESS_INTERVAL_S = 0.5
+# SLD-kohtaisten tuomioiden (laaja/brandables) välimuisti per tiedosto
+VERDICT_CACHE_MAX = 1 << 20
+
+# URL-scheme-merkit (urllib.parse.scheme_chars, pienillä kirjaimilla)
+_SCHEME_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789+-.")
+# tldextract hyväksyy myös ideografisen ja leveät pisteet label-erottimiksi
+_DOT_TABLE = str.maketrans("\u3002\uff0e\uff61", "...")
+
+# SLD:stä pidetään vain a-z ja - (bytes.translate poistaa loput yhdellä C-kierroksella)
+_SLD_DROP_BYTES = bytes(b for b in range(256) if not (97 <= b <= 122 or b == 45))
+
+# -------------------- PUBLIC SUFFIX LIST --------------------
+def _load_public_suffixes() -> Tuple[frozenset, frozenset, frozenset, int]:
+    """
+    Public Suffix List tldextractista kolmena settinä:
+    suffiksit (co.uk), wildcard-juuret (*.ck -> ck) ja poikkeukset (!www.ck -> www.ck),
+    sekä pisin suffiksi labeleina (wildcard lisää yhden).
+    """
+    if _TLDX is None:
+        return frozenset(), frozenset(), frozenset(), 1
+    try:
+        tlds = _TLDX.tlds
+        if callable(tlds):  # vanhemmissa tldextract-versioissa metodi
+            tlds = tlds()
+    except Exception:
+        return frozenset(), frozenset(), frozenset(), 1
+
+    plain, wildcard, exception = set(), set(), set()
+    for suffix in tlds:
+        if suffix.startswith("*."):
+            wildcard.add(suffix[2:])
+        elif suffix.startswith("!"):
+            exception.add(suffix[1:])
+        else:
+            plain.add(suffix)
+
+    # Lista on unicode-muodossa; lisätään myös punycode (xn--) -muodot
+    for target in (plain, wildcard, exception):
+        for suffix in [x for x in target if not x.isascii()]:
+            try:
+                target.add(suffix.encode("idna").decode("ascii"))
+            except UnicodeError:
+                pass
+
+    max_labels = max(
+        [s.count(".") + 1 for s in plain] + [s.count(".") + 2 for s in wildcard] + [1]
+    )
+    return frozenset(plain), frozenset(wildcard), frozenset(exception), max_labels
+
+# Ladataan ensimmäisellä käytöllä ja pidetään prosessin ajan (moduuli ei ajaudu uudelleen
+# Streamlitin rerunissa); poolin workerit saavat valmiin listan init_workerissa
+_PUBLIC_SUFFIXES: Optional[Tuple[frozenset, frozenset, frozenset, int]] = None
+
+def public_suffixes() -> Tuple[frozenset, frozenset, frozenset, int]:
+    global _PUBLIC_SUFFIXES
+    if _PUBLIC_SUFFIXES is None:
+        _PUBLIC_SUFFIXES = _load_public_suffixes()
+    return _PUBLIC_SUFFIXES
+
+# -------------------- WORDLIST --------------------
+class WordPrefixIndex:
+    """
+    Kevyt korvike marisa-trielle (kun marisa_trie puuttuu): sanojen 3-kirjaimiset alut.
+    Concat-haku hylkää heti SLD:t, joiden alusta ei ala yksikään sana.
+    """
+
+    def __init__(self, words: set[str]) -> None:
+        self.prefix3 = frozenset(w[:3] for w in words)
+
+# -------------------- DOMAIN PARSING --------------------
+def split_public_suffix(host: str) -> Tuple[Optional[str], Optional[str]]:
+    """Pisin PSL-suffiksi ja sitä edeltävä label. Esim. 'a.foo.co.uk' -> ('foo', 'co.uk')."""
+    plain, wildcard, exception, max_labels = public_suffixes()
+    # Yksi label enemmän kuin pisin suffiksi, jotta domain-label jää omakseen
+    labels = host.rsplit(".", max_labels + 1)
+    n = len(labels)
+    for k in range(min(n, max_labels), 0, -1):
+        suffix = ".".join(labels[n - k:])
+        if suffix in exception:
+            k -= 1
+            suffix = suffix.partition(".")[2]
+        elif not (suffix in plain or (k > 1 and suffix.partition(".")[2] in wildcard)):
+            continue
+        if k == n:
+            return None, None  # pelkkä suffiksi, ei domainia
+        return labels[n - k - 1], suffix
+    return None, None
+
+def domain_host(domain: str) -> str:
+    """
+    Raw-rivistä pelkkä host kuten ennen tldextractille: http(s):// ja www. pois, sitten
+    tldextractin tapaan muu scheme ('xxx://' tai '//'), polku/query/fragment, user@,
+    portti, välilyönnit ja loppupiste; pisteen muunnelmat (。．｡) -> '.'.
+    Esim. 'https://www.Foo.com:8080/x?y' -> 'foo.com', 'ftp://u@bar.co.uk /' -> 'bar.co.uk'.
+    """
+    d = domain.strip().lower().replace('"', "")
+    if d.startswith("http"):
+        if d.startswith("https://"):
+            d = d[8:]
+        elif d.startswith("http://"):
+            d = d[7:]
+    if d.startswith("www."):
+        d = d[4:]
+    # Loput tldextractin järjestyksessä: muu scheme, sitten host-osa
+    i = d.find("//")
+    if i == 0:
+        d = d[2:]
+    elif i >= 2 and d[i - 1] == ":" and not set(d[:i - 1]) - _SCHEME_CHARS:
+        d = d[i + 2:]
+    d = d.partition("/")[0].partition("?")[0].partition("#")[0]
+    d = d.rpartition("@")[2].partition(":")[0].strip()
+    return d.translate(_DOT_TABLE).rstrip(".")
+
+def get_sld_and_tld(domain: str) -> Tuple[Optional[str], Optional[str]]:
+    # Host ensin: .com-oikotie näkee vain paljaan hostin (ei user@, polkua, porttia)
+    d = domain_host(domain)
+
+    if d.endswith(".com") and d.count(".") == 1:
+        # Yleisin tapaus (sld.com): ei tarvita suffiksihakua
+        sld, tld = d[:-4], "com"
+    elif public_suffixes()[0]:
+        sld, tld = split_public_suffix(d)
+        if not sld:
+            return None, None
+    else:
+        parts = d.split(".")
+        if len(parts) < 2:
+            return None, None
+        tld = parts[-1]
+        sld = parts[-2]
+
+    # Puhdista sld kaikesta paitsi a-z ja -
+    sld_clean = sld.encode("ascii", "ignore").translate(None, _SLD_DROP_BYTES).decode("ascii")
+    if not sld_clean or not tld:
+        return None, None
+    return sld_clean, tld
+
+# -------------------- MATCH MODES --------------------
+def is_exact_word(sld: str, word_set: set[str]) -> bool:
+    """Täsmäosuma: vain yksi sana, ei väliviivaa eikä yhdistelmiä."""
+    if not sld or "-" in sld:
+        return False
+    return sld in word_set
+
+def is_valid_english_combo(sld: str, word_set: set[str], word_trie=None) -> bool:
+    """
+    Laaja: yksi sana, väliviiva-yhdistelmä, tai kahden sanan concat.
+    word_trie (load_word_trie) nopeuttaa concat-hakua, tulos on sama ilman sitä.
+    """
+    if not sld:
+        return False
+
+    # 1) Yksi sana
+    if sld in word_set:
+        return True
+
+    # 2) Väliviiva (word-word)
+    if "-" in sld:
+        parts = [p for p in sld.split("-") if p]
+        if len(parts) >= 2 and all(p in word_set for p in parts):
+            return True
+
+    # 3) Kahden sanan concat (wordword)
+    if isinstance(word_trie, WordPrefixIndex):
+        # Yksikään sana ei ala sld:n kolmella ensimmäisellä kirjaimella -> ei jakokohtaa
+        if sld[:3] not in word_trie.prefix3:
+            return False
+    elif word_trie is not None:
+        # Vain ne jakokohdat, joissa sld[:i] on sana (alkuosa vähintään 3, loppu vähintään 3)
+        for prefix in word_trie.prefixes(sld[:len(sld) - 3]):
+            if len(prefix) >= 3 and sld[len(prefix):] in word_set:
+                return True
+        return False
+
+    for i in range(3, len(sld) - 2):
+        if sld[:i] in word_set and sld[i:] in word_set:
+            return True
+
+    return False
+
+# -------------------- INPUT READING --------------------
+class MemoryReader(io.RawIOBase):
+    """Lukuvirta memoryview:n päälle ilman kopiota (io.BytesIO kopioisi puskurin)."""
+
+    def __init__(self, data) -> None:
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def tell(self) -> int:
+        return self._pos
+
+def iter_domains_from_stream(stream: BinaryIO, suffix: str) -> Iterable[str]:
+    # Domain oletetaan ensimmäiseksi sarakkeeksi (CSV) tai rivin alkuun (TXT)
+    # Dekoodataan virtana: koko tiedostoa ei pureta kerralla str:ksi
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="ignore", newline="")
+
+    if suffix.lower() == ".csv":
+        reader = csv.reader(text)
+        for row in reader:
+            if not row:
+                continue
+            yield row[0].strip()
+    else:
+        # Wrapper katkaisee vain \n/\r-kohdista; splitlines() jakaa loputkin
+        # rivinvaihdot (\v, \f, \x1c-\x1e, \x85, \u2028/9) kuten ennenkin
+        for chunk in text:
+            for line in chunk.splitlines():
+                raw = line.strip()
+                if not raw:
+                    continue
+                yield raw.split(",")[0].strip()
+
+# -------------------- PROCESS POOL WORKER --------------------
+# Sanalista, trie ja PSL workeriin kerran per prosessi (initializer), ei jokaisen tehtävän mukana
+_WORKER_WORDS: Optional[set[str]] = None
+_WORKER_TRIE = None
+
+def init_worker(words: set[str], word_trie, suffixes: Tuple[frozenset, frozenset, frozenset, int]) -> None:
+    global _WORKER_WORDS, _WORKER_TRIE, _PUBLIC_SUFFIXES
+    _WORKER_WORDS = words
+    _WORKER_TRIE = word_trie
+    _PUBLIC_SUFFIXES = suffixes
+
+# -------------------- FILE SCAN --------------------
+@dataclass
+class DomainScan:
+    """
+    Yhden tiedoston domainit (sld, tld, full) -kolmikkoina; tyhjät, parsimattomat
+    ja täsmälleen toistuvat rivit ohitetaan. lines = luetut rivit iteroinnin jälkeen.
+    """
+    data: memoryview
+    suffix: str
+    on_progress: Optional[Callable[[int], None]] = None
+    lines: int = 0
+
+    def __iter__(self) -> Iterable[Tuple[str, str, str]]:
+        raw_seen: set[int] = set()
+        stream = MemoryReader(self.data)
+        on_progress = self.on_progress
+        next_tick = time.monotonic() + PROGRESS_INTERVAL_S
+        for raw in iter_domains_from_stream(stream, self.suffix):
+            self.lines += 1
+            # Kello luetaan vain joka 4096. rivillä, UI-päivitys korkeintaan PROGRESS_INTERVAL_S välein
+            if on_progress is not None and not self.lines & 0xFFF:
+                now = time.monotonic()
+                if now >= next_tick:
+                    on_progress(stream.tell())
+                    next_tick = now + PROGRESS_INTERVAL_S
+
+            # Täsmälleen sama rivi on jo käsitelty -> ei parsita uudestaan.
+            # Settiin rivin 64-bit hash (int): kun mikään muu ei pidä raw-riviä, se vapautuu
+            # heti (300k uniikkia riviä: ~19 MB vs ~27 MB str-avaimilla). Hinta: hash-törmäys
+            # (todennäköisyys ~n²/2^65, 2M rivillä ~1e-7) ohittaisi rivin.
+            raw_key = hash(raw)
+            if raw_key in raw_seen:
+                continue
+            if len(raw_seen) < RAW_SEEN_MAX:
+                raw_seen.add(raw_key)
+
+            sld, tld = get_sld_and_tld(raw)
+            if not sld or not tld:
+                continue
+            yield sld, tld, f"{sld}.{tld}"
+
+def merge_file_results(parts: list, key: Optional[Callable] = None) -> Tuple[list, list]:
+    """Yhdistää per-tiedosto (com, others) -parit tiedostojärjestyksessä; sama domain useassa tiedostossa vain kerran."""
+    results_com: list = []
+    results_others: list = []
+    seen: set[str] = set()
+    for com, others in parts:
+        for src, dst in ((com, results_com), (others, results_others)):
+            for item in src:
+                full = item if key is None else key(item)
+                if full not in seen:
+                    seen.add(full)
+                    dst.append(item)
+    return results_com, results_others
+
+# -------------------- STANDARD FILTER (EXACT/BROAD) --------------------
+def _broad_matcher(words: set[str], word_trie=None) -> Callable[[str], bool]:
+    # Sama SLD toistuu eri TLD:illä (foo.com, foo.net) -> concat-haku kerran per SLD
+    return lru_cache(maxsize=VERDICT_CACHE_MAX)(
+        partial(is_valid_english_combo, word_set=words, word_trie=word_trie)
+    )
+
+def filter_file(data: memoryview, suffix: str, mode: str, words: set[str], word_trie=None, on_progress: Optional[Callable[[int], None]] = None):
+    """Yhden tiedoston seulonta. Palauttaa (com, others, rivit); duplikaatit poistettu tiedoston sisällä."""
+    results_com: List[str] = []
+    results_others: List[str] = []
+    seen: set[str] = set()
+
+    # Tarkistus valitaan kerran, ei joka rivillä
+    if mode == "exact":
+        is_match = partial(is_exact_word, word_set=words)
+    else:
+        is_match = _broad_matcher(words, word_trie)
+
+    scan = DomainScan(data, suffix, on_progress)
+    for sld, tld, full in scan:
+        if full in seen:
+            continue
+
+        if not is_match(sld):
+            continue
+
+        seen.add(full)
+        if tld == "com":
+            results_com.append(full)
+        else:
+            results_others.append(full)
+
+    return results_com, results_others, scan.lines
+
+def filter_file_worker(data: bytes, suffix: str, mode: str):
+    return filter_file(data, suffix, mode, _WORKER_WORDS, _WORKER_TRIE)
+
+# -------------------- BRANDABLES --------------------
+VOWELS = set("aeiouy")
+
+# Täysi C/V-kuvio (ei tiivistetty): reseptit 4–8 kirjaimeen
+# Esim. nanovian (8): n a n o v i a n -> C V C V C V V C = CVCVCVVC
+DEFAULT_ALLOWED_RUN_PATTERNS = [
+    # 4
+    "CVCV", "CVVC", "VCCV", "VCVC",
+
+    # 5
+    "CVCVC", "CVCCV", "CVCVV", "VCVCV", "VCCVC",
+
+    # 6
+    "CVCVCV", "CVCVVC", "CVCCVC", "CVCCVV", "VCVCVC", "VCCVCV",
+
+    # 7
+    "CVCVCVC", "CVCVVCV", "CVCVCVV", "CVCCVCV", "CVCCVVC", "VCCVCVC",
+
+    # 8 (sis. nanovian = CVCVCVVC)
+    "CVCVCVCV", "CVCVCVVC", "CVCVVCVC", "CVCCVCVC", "CVCCVVCV", "VCCVCVCV",
+]
+# Bonusreseptit = samat kuviot kuin DEFAULT_ALLOWED_RUN_PATTERNS (yksi lähde, ei kahta kopiota)
+RECIPE_PATTERNS = frozenset(DEFAULT_ALLOWED_RUN_PATTERNS)
+
+# Tiukennukset: harvinaiset kirjaimet ja huonot bigramit
+RARE_LETTERS = set("qxzj")
+_RARE_BYTES = "".join(sorted(RARE_LETTERS)).encode("ascii")
+DISALLOW_START = set("qx")
+DISALLOW_END = set("qx")
+BAD_BIGRAMS = {
+    "qx", "xq", "qj", "jq", "qz", "zq",
+    "wx", "xw", "vj", "jv", "zx", "xz",
+    "qh", "qk", "qc", "qg", "qt", "qd", "qb",
+}
+
+# ASCII-merkit -> V/C yhdellä str.translate-kierroksella
+_CV_TABLE = str.maketrans({chr(i): ("V" if chr(i) in VOWELS else "C") for i in range(128)})
+
+def cv_full_pattern(s: str) -> str:
+    """Täysi C/V-kuvio (ei tiivistystä). Esim. 'boon' -> CVVC."""
+    if s.isascii():
+        return s.translate(_CV_TABLE)
+    return "".join("V" if ch in VOWELS else "C" for ch in s)
+
+# Kolme samaa kirjainta peräkkäin (aaa)
+_RE_TRIPLE = re.compile(r"(.)\1\1")
+
+@lru_cache(maxsize=None)
+def _repeated_chunk_regex(n: int, repeats: int) -> re.Pattern:
+    """n merkin pala toistuu vähintään repeats kertaa peräkkäin. Käännetään kerran per (n, repeats)."""
+    return re.compile(rf"(.{{{n}}})\1{{{repeats-1},}}")
+
+def has_repeated_chunk(s: str, chunk_min: int = 2, repeats: int = 3) -> bool:
+    """Etsii toistuvia paloja (kakaka/akakaka)."""
+    for n in range(chunk_min, min(4, len(s) // repeats) + 1):
+        if _repeated_chunk_regex(n, repeats).search(s):
+            return True
+    return False
+
+def brandability_score(s: str, settings: Dict) -> Tuple[int, str]:
+    """
+    Palauttaa (score, run_pattern). Score korkeampi = parempi.
+    run_pattern on TÄYSI C/V-kuvio.
+    """
+    s = s.lower()
+
+    # Vain ASCII-kirjaimet (isascii on O(1)); sen jälkeen voidaan laskea tavuina
+    if not (s.isascii() and s.isalpha()):
+        return -999, ""
+    if len(s) < settings["min_len"] or len(s) > settings["max_len"]:
+        return -999, ""
+
+    # Ei väliviivoja brandables-tilassa
+    if "-" in s:
+        return -999, ""
+
+    # Jos halutaan nimenomaan ei-sanakirjaisia, hylätään oikeat sanat
+    if settings["reject_dictionary_words"] and s in settings["words"]:
+        return -999, ""
+
+    # ---- STRICT: hylkää q/x/z/j ja rumat bigramit ----
+    sb = s.encode("ascii")
+    rare_count = len(sb) - len(sb.translate(None, _RARE_BYTES))
+    if rare_count > settings["max_rare_letters"]:
+        return -999, ""
+
+    if settings["strict_brandables"]:
+        if s[0] in DISALLOW_START or s[-1] in DISALLOW_END:
+            return -999, ""
+        if any((s[i:i+2] in BAD_BIGRAMS) for i in range(len(s) - 1)):
+            return -999, ""
+
+    # Kova hylkäys: 3 samaa peräkkäin
+    if _RE_TRIPLE.search(s):
+        return -999, ""
+
+    # Kova hylkäys: tavutoisto
+    if settings["reject_repeats"] and has_repeated_chunk(s, chunk_min=2, repeats=3):
+        return -999, ""
+
+    # Liian pieni diversiteetti (esim. {a,k})
+    if len(set(s)) < settings["min_unique_chars"]:
+        return -999, ""
+
+    run_pat = cv_full_pattern(s)
+
+    # Runko-rajoitin (täysi kuvio)
+    allowed: Set[str] = settings["allowed_run_patterns"]
+    if allowed and run_pat not in allowed:
+        return -50, run_pat
+
+    score = 0
+
+    # Pituusbonus
+    if 5 <= len(s) <= 9:
+        score += 12
+    elif 4 <= len(s) <= 11:
+        score += 6
+    else:
+        score -= 8
+
+    # Pehmeä penalti harvinaisille kirjaimille (vaikka sallittaisiin)
+    score -= 10 * rare_count
+
+    # Vokaalisuhde (vokaalit = V:t täydessä kuviossa)
+    vcount = run_pat.count("V")
+    v_ratio = vcount / len(s)
+    if settings["vowel_min"] <= v_ratio <= settings["vowel_max"]:
+        score += 25
+    elif (settings["vowel_min"] - 0.08) <= v_ratio <= (settings["vowel_max"] + 0.08):
+        score += 10
+    else:
+        score -= 18
+
+    # Konsonanttijonot (pisin C-jono kuviosta)
+    max_run = settings["max_consonant_run"]
+    c_run = max(map(len, run_pat.split("V")))
+    if c_run >= max_run + 1:
+        score -= 30
+    elif c_run >= max_run:
+        score -= 12
+
+    # Monotoninen CV-vuorottelu pitkästi (kakakaka): (CV){4,} tai (VC){4,}
+    if "CVCVCVCV" in run_pat or "VCVCVCVC" in run_pat:
+        score -= 18
+
+    # Bonus resepteille 4–8 (sis. nanovian = CVCVCVVC)
+    if run_pat in RECIPE_PATTERNS:
+        score += 6
+
+    return score, run_pat
+
+def _brandables_scorer(settings: Dict, words: set[str]) -> Callable[[str], Tuple[int, str]]:
+    # talletetaan words settingsiin (jotta voidaan reject_dictionary_words)
+    settings = dict(settings)
+    settings["words"] = words
+    # Score riippuu vain SLD:stä (asetukset kiinteät ajon ajan) -> kerran per SLD
+    return lru_cache(maxsize=VERDICT_CACHE_MAX)(partial(brandability_score, settings=settings))
+
+def sort_brandables(results_com: list, results_others: list) -> None:
+    # Paras ensin
+    results_com.sort(key=lambda x: x[1], reverse=True)
+    results_others.sort(key=lambda x: x[1], reverse=True)
+
+def brandables_file(data: memoryview, suffix: str, settings: Dict, words: set[str], on_progress: Optional[Callable[[int], None]] = None):
+    """Yhden tiedoston brandables-seulonta. Palauttaa (com, others, rivit); rivit = (domain, score, run_pat)."""
+    score_sld = _brandables_scorer(settings, words)
+    threshold = settings["score_threshold"]
+
+    results_com = []     # list of (domain, score, run_pat)
+    results_others = []  # list of (domain, score, run_pat)
+    seen: set[str] = set()
+
+    scan = DomainScan(data, suffix, on_progress)
+    for sld, tld, full in scan:
+        if full in seen:
+            continue
+
+        score, run_pat = score_sld(sld)
+        if score < threshold:
+            continue
+
+        seen.add(full)
+        item = (full, score, run_pat)
+        if tld == "com":
+            results_com.append(item)
+        else:
+            results_others.append(item)
+
+    return results_com, results_others, scan.lines
+
+def brandables_file_worker(data: bytes, suffix: str, settings: Dict):
+    return brandables_file(data, suffix, settings, _WORKER_WORDS)
+
+# -------------------- ALL MODES (ONE PASS) --------------------
+def all_modes_file(data: memoryview, suffix: str, settings: Dict, words: set[str], word_trie=None, on_progress: Optional[Callable[[int], None]] = None):
+    """
+    Täsmä, laaja ja brandables yhdellä lukukierroksella: jokainen rivi dekoodataan
+    ja parsitaan kerran. Palauttaa (exact_com, exact_oth, broad_com, broad_oth,
+    brand_com, brand_oth, rivit).
+    """
+    is_broad = _broad_matcher(words, word_trie)
+    score_sld = _brandables_scorer(settings, words)
+    threshold = settings["score_threshold"]
+
+    exact_com, exact_oth, broad_com, broad_oth, brand_com, brand_oth = [], [], [], [], [], []
+    exact_seen: set[str] = set()
+    broad_seen: set[str] = set()
+    brand_seen: set[str] = set()
+
+    scan = DomainScan(data, suffix, on_progress)
+    for sld, tld, full in scan:
+        is_com = tld == "com"
+
+        # Täsmäosuma on aina myös laaja osuma
+        if full not in broad_seen and is_broad(sld):
+            broad_seen.add(full)
+            (broad_com if is_com else broad_oth).append(full)
+            if full not in exact_seen and is_exact_word(sld, words):
+                exact_seen.add(full)
+                (exact_com if is_com else exact_oth).append(full)
+
+        if full not in brand_seen:
+            score, run_pat = score_sld(sld)
+            if score >= threshold:
+                brand_seen.add(full)
+                (brand_com if is_com else brand_oth).append((full, score, run_pat))
+
+    return exact_com, exact_oth, broad_com, broad_oth, brand_com, brand_oth, scan.lines
+
+def all_modes_file_worker(data: bytes, suffix: str, settings: Dict):
+    return all_modes_file(data, suffix, settings, _WORKER_WORDS, _WORKER_TRIE)